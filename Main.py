@@ -39,6 +39,7 @@ import stackprinter
 stackprinter.set_excepthook(style='darkbg2')
 
 from finance.venmo import ConvertVenmoStatement
+from finance.stats import PrintStatementStats
 
 # Utility for print()ing debug info:
 # https://github.com/gruns/icecream
@@ -68,6 +69,22 @@ def fnConvertVenmoToCSV(args):
     # do the conversion:
     ConvertVenmoStatement(args.SRC, args.DEST)
 
+def fnStatementStats(args):
+    print(f'\nSpending stats for {len(args.FILES)} converted statement(s)\n')
+
+    files = [os.path.abspath(f) for f in args.FILES]
+    missing = [f for f in files if not os.path.isfile(f)]
+    if missing:
+        print("'FILES' arguments must all be files but these aren't:\n\t" + "\n\t".join(missing))
+        sys.exit()
+
+    if args.top <= 0:
+        print("'--top' must be a positive number")
+        sys.exit()
+
+    alias_file = os.path.abspath(args.payees) if args.payees is not None else None
+    PrintStatementStats(files, args.yearly, args.top, alias_file, args.verbose)
+
 #endregion
 
 def CLI():
@@ -123,6 +140,24 @@ def CLI():
                                                 description=szHelp)
         parser_exam_gen.set_defaults(func=fnConvertVenmoToCSV)
 
+        szSummary = 'Spending stats over converted statements (CSV files)'
+        szHelp = 'Load the CSV files written by the convert commands and print monthly (or yearly) totals per ' \
+                 'account and per payments/other credits/purchases, the top payees, and the ending balances'
+        parser_exam_gen = venmo_subparsers.add_parser('stats',
+                                                aliases=['s'],
+                                                parents=[parser_verbose],
+                                                help=szSummary,
+                                                description=szHelp)
+        parser_exam_gen.add_argument('FILES', nargs='+', help='the converted statements (CSV files)')
+        parser_exam_gen.add_argument('-y', '--yearly', action='store_true',
+                                     help='Group totals by year instead of by month')
+        parser_exam_gen.add_argument('-t', '--top', type=int, default=10,
+                                     help='How many of the top payees to list (default: 10)')
+        parser_exam_gen.add_argument('-p', '--payees', metavar='ALIAS_FILE',
+                                     help='Group payees by normalized merchant name, using (and updating) the '
+                                          'description -> payee alias table in ALIAS_FILE (a CSV)')
+        parser_exam_gen.set_defaults(func=fnStatementStats)
+
     setup_exam_gen_parsers(subparsers)
 
 #endregion
@@ -26,7 +26,7 @@ from transitions import Machine
 # from pdfminer.high_level import extract_text
 import pymupdf
 
-from finance.transaction import Transaction
+from finance.transaction import Transaction, rePAYMENT
 
 
 previous_balance_date: date = None
@@ -45,7 +45,6 @@ class BecuReadingFSMStates(Enum):
 
 rePREVIOUS_BALANCE_DATE = re.compile("(\d\d/\d\d/\d\d\d\d)")
 reDateOfTransaction = re.compile("(\d\d/\d\d)")
-rePAYMENT = re.compile("PAYMENT - THANK YOU")
 reAmount = re.compile(r'-?\$(\d{1,3}(?:,\d{3})*(?:\.\d{2})?|\d+(\.\d{2})?)')
 class BecuReaderFSM:
     def __init__(self):
@@ -0,0 +1,208 @@
+# Basic plan:
+# PayeeIndex maps raw transaction descriptions (whatever save_xact_desc captured) onto canonical payees
+# Each description goes through three steps, cheapest first:
+#   1) Exact alias lookup (raw description -> payee); once a description has been seen this is all we do
+#   2) Clean the description (clean_description: drop "SQ *"-style processor prefixes, store numbers,
+#       trailing "CITY ST", etc.) and look up the cleaned form
+#       If a "CITY ST" was dropped and the cleaned form is an existing key plus one more word, it's that key
+#       (the first word of a two-word city: "STARBUCKS STORE CEDAR" of "... CEDAR RAPIDS IA")
+#   3) Otherwise find candidate keys through an inverted trigram index, count the trigrams each candidate shares
+#       with the cleaned description, and score only those candidates (Dice coefficient).
+#       A candidate must start with the same word as the cleaned description, so that APPLEBEES doesn't turn into
+#       APPLE; the index is split by first word (first word -> trigram -> keys), so only those keys are counted.
+#       The best one above the threshold wins, otherwise the cleaned form becomes a new payee
+# This avoids comparing every description against every other one
+#
+# Matching is done on keys (every cleaned form seen for a payee, plus its cleaned name), never on the display name,
+#   so a payee keeps matching after it's been renamed.  A payee that still has a generated name is named after
+#   its shortest cleaned form (so leftovers like the SAN of SAN FRANCISCO fall away as more variants show up)
+#
+# The alias table is saved as a CSV (Description, Payee) so later runs start with step 1 for everything seen before;
+#   hand-editing the Payee column is the way to merge/rename payees
+
+import csv
+import os
+import re
+from collections import Counter, defaultdict
+
+from attrs import define, field
+
+
+DEFAULT_THRESHOLD = 0.6
+
+# Payment processors that put their own name in front of the merchant's
+reProcessorPrefix = re.compile(r"^(?:SQ|SQU|TST|SP|PP|PAYPAL|PY|IN|BT|DD|LS|GOOGLE|APL|APPLE PAY)\s*\*\s*")
+reStoreNumber = re.compile(r"#\s*\d+|\b\d{3,}\b|\b\d+[A-Z]?-\d+\b")
+rePhoneNumber = re.compile(r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b")
+reWebsite = re.compile(r"\b(?:WWW\.)?([A-Z0-9-]+)\.(?:COM|NET|ORG)\S*")
+reReferenceCode = re.compile(r"\*\S*")
+reNonWord = re.compile(r"[^A-Z0-9&' ]+")
+reSpaces = re.compile(r"\s+")
+
+US_STATES = {
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS", "KY",
+    "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC", "ND", "OH",
+    "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+}
+
+# First words of multi-word city names ("SAN FRANCISCO", "FORT WORTH", ...)
+CITY_PREFIXES = {
+    "SAN", "SANTA", "LOS", "LAS", "EL", "NEW", "FORT", "FT", "SAINT", "ST", "PORT", "MOUNT", "MT", "PALM",
+    "NORTH", "SOUTH", "EAST", "WEST", "LAKE", "SALT", "CORPUS", "BATON", "GRAND", "COLORADO", "OKLAHOMA",
+}
+
+
+def _clean(desc: str) -> (str, str):
+    """(cleaned description, cleaned description minus its last word if a "CITY ST" was dropped, else None)"""
+    original = desc = desc.upper().strip()
+    desc = reProcessorPrefix.sub("", desc)
+    desc = reWebsite.sub(r"\1", desc)
+    desc = reReferenceCode.sub(" ", desc)
+    desc = rePhoneNumber.sub(" ", desc)
+    desc = reStoreNumber.sub(" ", desc)
+    desc = reNonWord.sub(" ", desc)
+    words = [w for w in reSpaces.sub(" ", desc).strip().split(" ") if w]
+
+    # Card statements end with "CITY ST"; drop both (but never the whole description)
+    dropped_city = len(words) > 2 and words[-1] in US_STATES
+    if dropped_city:
+        words = words[:-2]
+        if len(words) > 1 and words[-1] in CITY_PREFIXES:
+            words = words[:-1]
+
+    if not words:
+        return original, None
+    trimmed = " ".join(words[:-1]) if dropped_city and len(words) > 1 else None
+    return " ".join(words), trimmed
+
+
+def clean_description(desc: str) -> str:
+    """'SQ *BLUE BOTTLE #0042 SEATTLE WA' -> 'BLUE BOTTLE'"""
+    return _clean(desc)[0]
+
+
+def first_word(text: str) -> str:
+    return text.split(" ", 1)[0]
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@define
+class PayeeIndex:
+    threshold: float = DEFAULT_THRESHOLD
+    payees: [str] = field(factory=list)  # display names of the payees; a payee's id is its position here
+    aliases: {str: int} = field(factory=dict)  # raw description -> payee id
+    cleaned_aliases: {str: int} = field(factory=dict)  # key (cleaned description) -> payee id
+    _payee_ids: {str: int} = field(factory=dict)  # display name -> payee id
+    _keys: [str] = field(factory=list)  # every key in cleaned_aliases; a key's id is its position here
+    _key_sizes: [int] = field(factory=list)  # number of trigrams in each key
+    # first word -> trigram -> ids of the keys starting with that word & containing that trigram
+    _postings: {str: {str: [int]}} = field(factory=lambda: defaultdict(lambda: defaultdict(list)))
+
+    def _add_key(self, cleaned: str, payee_id: int):
+        if cleaned in self.cleaned_aliases:
+            return
+        self.cleaned_aliases[cleaned] = payee_id
+
+        key_id = len(self._keys)
+        self._keys.append(cleaned)
+        grams = trigrams(cleaned)
+        self._key_sizes.append(len(grams))
+        postings = self._postings[first_word(cleaned)]
+        for gram in grams:
+            postings[gram].append(key_id)
+
+    def _add_payee(self, name: str) -> int:
+        payee_id = self._payee_ids.get(name)
+        if payee_id is not None:
+            return payee_id
+
+        payee_id = len(self.payees)
+        self.payees.append(name)
+        self._payee_ids[name] = payee_id
+        self._add_key(clean_description(name), payee_id)
+        return payee_id
+
+    def _maybe_rename(self, payee_id: int, cleaned: str):
+        """Rename a payee to a shorter cleaned form, unless its name was chosen by hand (isn't one of its keys)"""
+        name = self.payees[payee_id]
+        if len(cleaned) >= len(name) or self.cleaned_aliases.get(name) != payee_id or cleaned in self._payee_ids:
+            return
+        del self._payee_ids[name]
+        self.payees[payee_id] = cleaned
+        self._payee_ids[cleaned] = payee_id
+
+    def best_match(self, cleaned: str) -> (int, float):
+        """Most similar existing payee as (payee id, Dice score), or (None, 0.0) if nothing clears the threshold.
+        Only keys that start with the same word as cleaned are considered"""
+        postings = self._postings.get(first_word(cleaned))
+        if not postings:
+            return None, 0.0
+
+        grams = trigrams(cleaned)
+        shared = Counter()
+        for gram in grams:
+            key_ids = postings.get(gram)
+            if key_ids:
+                shared.update(key_ids)
+
+        best_id, best_score = None, 0.0
+        for key_id, count in shared.items():
+            score = 2 * count / (len(grams) + self._key_sizes[key_id])
+            if score > best_score:
+                best_id, best_score = self.cleaned_aliases[self._keys[key_id]], score
+
+        if best_score < self.threshold:
+            return None, 0.0
+        return best_id, best_score
+
+    def lookup(self, desc: str) -> int:
+        """Payee id for a raw description, adding it (and possibly a new payee) if it hasn't been seen before"""
+        payee_id = self.aliases.get(desc)
+        if payee_id is not None:
+            return payee_id
+
+        cleaned, trimmed = _clean(desc)
+        payee_id = self.cleaned_aliases.get(cleaned)
+        if payee_id is None and trimmed is not None:
+            payee_id = self.cleaned_aliases.get(trimmed)
+        if payee_id is None:
+            payee_id, _ = self.best_match(cleaned)
+            if payee_id is None:
+                payee_id = self._add_payee(cleaned)
+            self._add_key(cleaned, payee_id)
+            self._maybe_rename(payee_id, cleaned)
+
+        self.aliases[desc] = payee_id
+        return payee_id
+
+    def payee(self, desc: str) -> str:
+        return self.payees[self.lookup(desc)]
+
+    @classmethod
+    def load(cls, alias_file: str, threshold: float = DEFAULT_THRESHOLD):
+        """Read an alias table written by save(); a missing file just gives an empty index"""
+        index = cls(threshold)
+        if not os.path.isfile(alias_file):
+            return index
+
+        with open(alias_file, newline='') as csvfile:
+            rows = csv.reader(csvfile)
+            next(rows, None)  # header
+            for row in rows:
+                if len(row) < 2:
+                    continue
+                desc, payee = row[0], row[1]
+                payee_id = index._add_payee(payee)
+                index.aliases[desc] = payee_id
+                index._add_key(clean_description(desc), payee_id)
+        return index
+
+    def save(self, alias_file: str):
+        with open(alias_file, 'w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(["Description", "Payee"])
+            csv_writer.writerows(sorted((desc, self.payees[payee_id]) for desc, payee_id in self.aliases.items()))
@@ -0,0 +1,237 @@
+# Basic plan:
+# LoadStatements is the entry point.
+# It reads every converted CSV (the files that ConvertBecuStatement / ConvertVenmoStatement write) exactly once
+#   and packs the transactions into parallel NumPy arrays (StatementArrays):
+#       account code, day ordinal, amount in integer cents, description code, transaction class
+#   Strings (account names, descriptions) are stored once in a lookup list and referred to by code,
+#       so that all of the grouping below is done on integers
+# After that every report is a vectorized group-by:
+#   build a single integer key per row, sort by it (stable), then np.add.reduceat over each run of equal keys
+#   Running balances are a cumsum over rows sorted by (account, date), re-based at the start of each account.
+#   The CSVs don't carry the previous balance, so these are the net change since the first loaded transaction
+#
+# The converters negate payments & other credits and leave purchases as they are, so the class of a
+#   transaction is recovered from the sign of the amount: negative rows are credits, and a credit is a payment
+#   when its description matches rePAYMENT (the same rule ConvertBecuStatement uses).
+#   Venmo statements are classified by statement section instead, which the CSV doesn't record, so Venmo payments
+#   that don't match rePAYMENT show up here as other credits
+
+import csv
+from datetime import date
+
+import numpy as np
+from attrs import define, field
+
+from finance.payees import PayeeIndex
+from finance.transaction import rePAYMENT
+
+
+ACCOUNT_NAME_PREFIX = "Account Name:"
+
+# Transaction classes, stored as int8 in StatementArrays.xact_class
+PAYMENT = 0
+OTHER_CREDIT = 1
+PURCHASE = 2
+XACT_CLASS_NAMES = ["payments", "other credits", "purchases"]
+
+# numpy's datetime64[D] counts days from 1970-01-01; date.toordinal() counts from 0001-01-01
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@define
+class StatementArrays:
+    account_names: [str] = field(factory=list)
+    descriptions: [str] = field(factory=list)
+    account: np.ndarray = field(factory=lambda: np.empty(0, dtype=np.int32))
+    day: np.ndarray = field(factory=lambda: np.empty(0, dtype=np.int64))
+    cents: np.ndarray = field(factory=lambda: np.empty(0, dtype=np.int64))
+    desc: np.ndarray = field(factory=lambda: np.empty(0, dtype=np.int32))
+    xact_class: np.ndarray = field(factory=lambda: np.empty(0, dtype=np.int8))
+
+    def __len__(self):
+        return len(self.day)
+
+    def months(self) -> np.ndarray:
+        """Months since 1970-01 for every row (so year = 1970 + m // 12, month = m % 12 + 1)"""
+        return (self.day - _EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+    def years(self) -> np.ndarray:
+        return 1970 + self.months() // 12
+
+
+def parse_cents(amount: str) -> int:
+    """'-1,234.5' -> -123450, without going through float"""
+    amount = amount.strip().replace(",", "").replace("$", "")
+    negative = amount.startswith("-")
+    whole, _, frac = amount.lstrip("+-").partition(".")
+    cents = int(whole or "0") * 100 + int((frac + "00")[:2])
+    return -cents if negative else cents
+
+
+def format_cents(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    dollars, rem = divmod(abs(int(cents)), 100)
+    return f"{sign}{dollars}.{rem:02d}"
+
+
+def LoadStatements(files_to_load: [str]) -> StatementArrays:
+    account_codes = {}
+    desc_codes = {}
+    account, day, cents, desc = [], [], [], []
+
+    for file_name in files_to_load:
+        with open(file_name, newline='') as csvfile:
+            rows = csv.reader(csvfile)
+            first = next(rows, None)
+            if first is None:
+                continue
+
+            if first[0].startswith(ACCOUNT_NAME_PREFIX):
+                account_name = first[0][len(ACCOUNT_NAME_PREFIX):].strip()
+                next(rows, None)  # skip the Transaction.get_csv_header() row
+            else:
+                account_name = file_name  # no account line, so the first row was the header
+            acct_code = account_codes.setdefault(account_name, len(account_codes))
+
+            for row in rows:
+                if len(row) < 4 or not row[0]:
+                    continue
+                account.append(acct_code)
+                day.append(date.fromisoformat(row[0]).toordinal())
+                desc.append(desc_codes.setdefault(row[2], len(desc_codes)))
+                cents.append(parse_cents(row[3]))
+
+    result = StatementArrays(account_names=list(account_codes), descriptions=list(desc_codes),
+                             account=np.array(account, dtype=np.int32),
+                             day=np.array(day, dtype=np.int64),
+                             cents=np.array(cents, dtype=np.int64),
+                             desc=np.array(desc, dtype=np.int32))
+
+    # Classify once per distinct description rather than once per row
+    is_payment_desc = np.array([rePAYMENT.search(d) is not None for d in result.descriptions], dtype=bool)
+    result.xact_class = np.where(result.cents >= 0, PURCHASE,
+                                 np.where(is_payment_desc[result.desc], PAYMENT, OTHER_CREDIT)).astype(np.int8)
+    return result
+
+
+def group_sum(keys: np.ndarray, values: np.ndarray) -> (np.ndarray, np.ndarray):
+    """Sum values over each distinct key; returns (sorted distinct keys, sums)"""
+    if len(keys) == 0:
+        return keys[:0], values[:0]
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    uniq, starts = np.unique(sorted_keys, return_index=True)
+    return uniq, np.add.reduceat(values[order], starts)
+
+
+def period_totals(stmts: StatementArrays, yearly: bool = False) -> [(str, int, int, int)]:
+    """Totals per (account, period, class) as (account name, period, class, cents), in that sort order.
+    period is months-since-1970 when yearly is False, otherwise the calendar year"""
+    if len(stmts) == 0:
+        return []
+
+    period = stmts.years() if yearly else stmts.months()
+    period_base = int(period.min())
+    num_periods = int(period.max()) - period_base + 1
+    num_classes = len(XACT_CLASS_NAMES)
+
+    keys = (stmts.account.astype(np.int64) * num_periods + (period - period_base)) * num_classes + stmts.xact_class
+    uniq, sums = group_sum(keys, stmts.cents)
+
+    acct, rest = np.divmod(uniq, num_periods * num_classes)
+    per, cls = np.divmod(rest, num_classes)
+    return [(stmts.account_names[a], int(p + period_base), int(c), int(s))
+            for a, p, c, s in zip(acct, per, cls, sums)]
+
+
+def top_payees(stmts: StatementArrays, count: int = 10, labels: np.ndarray = None,
+               label_names: [str] = None) -> [(str, int, int)]:
+    """The payees with the largest total purchases, as (payee, number of purchases, cents).
+    By default payees are the raw descriptions; pass labels (one code per row) & label_names to group differently"""
+    if count <= 0:
+        raise ValueError(f"count must be positive, but it's {count}")
+    if labels is None:
+        labels, label_names = stmts.desc, stmts.descriptions
+
+    purchases = stmts.xact_class == PURCHASE
+    num_labels = len(label_names)
+    totals = np.zeros(num_labels, dtype=np.int64)  # np.add.at rather than bincount(weights=) to stay in int64 cents
+    np.add.at(totals, labels[purchases], stmts.cents[purchases])
+    counts = np.bincount(labels[purchases], minlength=num_labels)
+
+    best = np.argsort(-totals, kind='stable')[:count]
+    return [(label_names[i], int(counts[i]), int(totals[i])) for i in best if counts[i] > 0]
+
+
+def payee_labels(stmts: StatementArrays, index: PayeeIndex) -> (np.ndarray, [str]):
+    """Canonical payee code for every row (for top_payees), looking up each distinct description only once"""
+    desc_to_payee = np.array([index.lookup(d) for d in stmts.descriptions], dtype=np.int32)
+    return desc_to_payee[stmts.desc], index.payees
+
+
+def running_balances(stmts: StatementArrays) -> (np.ndarray, np.ndarray):
+    """Net change (in cents) of each account since its first loaded transaction, after every transaction.
+    The CSVs don't include the previous balance, so this is not the account's actual balance.
+    Returns (order, balances): order sorts the rows by (account, date) and balances[i] belongs to row order[i]"""
+    order = np.lexsort((stmts.day, stmts.account))
+    if len(order) == 0:
+        return order, stmts.cents[:0]
+
+    sorted_acct = stmts.account[order]
+    balances = np.cumsum(stmts.cents[order])
+
+    # Re-base each account's cumsum so it starts from zero
+    starts = np.flatnonzero(np.r_[True, sorted_acct[1:] != sorted_acct[:-1]])
+    offsets = np.r_[0, balances[starts[1:] - 1]]
+    run_lengths = np.diff(np.r_[starts, len(order)])
+    balances -= np.repeat(offsets, run_lengths)
+    return order, balances
+
+
+def _period_name(period: int, yearly: bool) -> str:
+    if yearly:
+        return str(period)
+    year, month = divmod(period, 12)
+    return f"{1970 + year}-{month + 1:02d}"
+
+
+def PrintStatementStats(files_to_load: [str], yearly: bool = False, num_payees: int = 10,
+                        alias_file: str = None, verbose: int = 0):
+    stmts = LoadStatements(files_to_load)
+    print(f"Loaded {len(stmts)} transactions from {len(files_to_load)} file(s), "
+          f"{len(stmts.account_names)} account(s)\n")
+    if len(stmts) == 0:
+        return
+
+    print("Yearly totals:" if yearly else "Monthly totals:")
+    last_account = None
+    for account_name, period, cls, cents in period_totals(stmts, yearly):
+        if account_name != last_account:
+            print(f"  {account_name}")
+            last_account = account_name
+        print(f"\t{_period_name(period, yearly)}\t{XACT_CLASS_NAMES[cls]:<14}\t{format_cents(cents):>12}")
+
+    labels, label_names = None, None
+    if alias_file is not None:
+        index = PayeeIndex.load(alias_file)
+        labels, label_names = payee_labels(stmts, index)
+        index.save(alias_file)
+
+    print(f"\nTop {num_payees} payees (by total purchases):")
+    for payee, count, cents in top_payees(stmts, num_payees, labels, label_names):
+        print(f"\t{format_cents(cents):>12}\t{count:>5}x\t{payee}")
+
+    print("\nNet change since first loaded transaction:")
+    order, balances = running_balances(stmts)
+    sorted_acct = stmts.account[order]
+    ends = np.flatnonzero(np.r_[sorted_acct[1:] != sorted_acct[:-1], True])
+    for end in ends:
+        row = order[end]
+        print(f"\t{stmts.account_names[stmts.account[row]]}\t"
+              f"{date.fromordinal(int(stmts.day[row]))}\t{format_cents(balances[end]):>12}")
+
+    if verbose:
+        print("\nRunning net change since first loaded transaction:")
+        for row, balance in zip(order, balances):
+            print(f"\t{stmts.account_names[stmts.account[row]]}\t{date.fromordinal(int(stmts.day[row]))}\t"
+                  f"{format_cents(stmts.cents[row]):>12}\t{format_cents(balance):>12}\t{stmts.descriptions[stmts.desc[row]]}")
@@ -1,7 +1,11 @@
+import re
 from decimal import Decimal
 from attrs import define
 from datetime import date
 
+# A credit whose description matches this is a payment rather than some other credit
+rePAYMENT = re.compile("PAYMENT - THANK YOU")
+
 @define
 class Transaction:
     post_date: date = None
@@ -0,0 +1,87 @@
+import pytest
+
+from finance.payees import PayeeIndex, clean_description
+
+
+@pytest.mark.parametrize("desc, cleaned", [
+    ("SQ *BLUE BOTTLE #0042 SEATTLE WA", "BLUE BOTTLE"),
+    ("TST* Blue Bottle Coffee 1234 Oakland CA", "BLUE BOTTLE COFFEE"),
+    ("STARBUCKS STORE 12345 SAN FRANCISCO CA", "STARBUCKS STORE"),
+    ("STARBUCKS STORE 999 SEATTLE WA", "STARBUCKS STORE"),
+    ("AMAZON.COM*2K4 AMZN.COM/BILL WA", "AMAZON"),
+    ("NETFLIX.COM", "NETFLIX"),
+    ("PAYMENT - THANK YOU", "PAYMENT THANK YOU"),
+    ("12345", "12345"),  # never cleaned away to nothing
+])
+def test_clean_description(desc, cleaned):
+    assert clean_description(desc) == cleaned
+
+
+@pytest.mark.parametrize("first, second", [
+    ("SQ *BLUE BOTTLE #0042 SEATTLE WA", "TST* Blue Bottle Coffee 1234 Oakland CA"),
+    ("STARBUCKS STORE 01234 BELLEVUE WA", "STARBUCKS 05678 SEATTLE WA"),
+    ("SAFEWAY #1234 KIRKLAND WA", "SAFEWAY FUEL 555 KIRKLAND WA"),
+    ("AMAZON.COM*2K4 AMZN.COM/BILL WA", "AMAZON.COM*9Z1 AMZN.COM/BILL WA"),
+])
+def test_variants_merge(first, second):
+    index = PayeeIndex()
+    assert index.lookup(first) == index.lookup(second)
+
+
+@pytest.mark.parametrize("first, second", [
+    ("APPLE", "APPLEBEES"),
+    ("CHASE", "CHASER"),
+    ("SEATTLE CITY LIGHT", "CITY OF SEATTLE"),
+    ("SHOP1", "SHOP12"),
+])
+def test_different_merchants_stay_apart(first, second):
+    for a, b in [(first, second), (second, first)]:
+        index = PayeeIndex()
+        assert index.lookup(a) != index.lookup(b)
+
+
+def test_numbered_merchants_stay_apart():
+    index = PayeeIndex()
+    for i in range(3000):
+        index.lookup(f"SHOP{i}")
+    assert len(index.payees) == 3000
+
+
+@pytest.mark.parametrize("descs", [
+    ["STARBUCKS STORE 12345 CEDAR RAPIDS IA", "STARBUCKS STORE 999 SEATTLE WA"],
+    ["STARBUCKS STORE 999 SEATTLE WA", "STARBUCKS STORE 12345 CEDAR RAPIDS IA"],
+])
+def test_two_word_city_leaves_no_stray_word(descs):
+    index = PayeeIndex()
+    payee_ids = {index.lookup(desc) for desc in descs}
+    assert len(payee_ids) == 1
+    assert index.payees[payee_ids.pop()] == "STARBUCKS STORE"
+
+
+def test_save_load_round_trip(tmp_path):
+    alias_file = str(tmp_path / "aliases.csv")
+    index = PayeeIndex()
+    for desc in ["STARBUCKS 05678 SEATTLE WA", "STARBUCKS STORE 01234 BELLEVUE WA", "SAFEWAY #1234 KIRKLAND WA"]:
+        index.lookup(desc)
+    index.save(alias_file)
+
+    reloaded = PayeeIndex.load(alias_file)
+    assert reloaded.aliases.keys() == index.aliases.keys()
+    for desc in index.aliases:
+        assert reloaded.payee(desc) == index.payee(desc)
+    assert reloaded.payee("STARBUCKS #777 PORTLAND OR") == index.payee("STARBUCKS 05678 SEATTLE WA")
+
+
+def test_renamed_payee_still_matches(tmp_path):
+    alias_file = tmp_path / "aliases.csv"
+    alias_file.write_text("Description,Payee\n"
+                          "STARBUCKS 05678 SEATTLE WA,Starbucks\n"
+                          "STARBUCKS STORE 01234 BELLEVUE WA,Starbucks\n")
+
+    index = PayeeIndex.load(str(alias_file))
+    assert index.payee("STARBUCKS #777 PORTLAND OR") == "Starbucks"
+    assert index.payee("STARBUCKS STORE 4 TACOMA WA") == "Starbucks"
+    assert index.payees == ["Starbucks"]
+
+    index.save(str(alias_file))
+    assert PayeeIndex.load(str(alias_file)).payee("STARBUCKS #777 PORTLAND OR") == "Starbucks"
@@ -0,0 +1,117 @@
+import csv
+from datetime import date
+
+import numpy as np
+import pytest
+
+from finance.stats import (LoadStatements, OTHER_CREDIT, PAYMENT, PURCHASE, StatementArrays, parse_cents,
+                           period_totals, running_balances, top_payees)
+from finance.transaction import Transaction
+
+
+def write_statement(path, account_name, rows):
+    """Write rows of (date, description, amount) the way the converters do"""
+    with open(path, 'w', newline='') as csvfile:
+        csv_writer = csv.writer(csvfile)
+        csv_writer.writerow([f"Account Name: {account_name}"])
+        csv_writer.writerow(Transaction.get_csv_header())
+        csv_writer.writerows([d, "ref", desc, amount] for d, desc, amount in rows)
+    return str(path)
+
+
+@pytest.fixture
+def two_accounts(tmp_path):
+    visa = write_statement(tmp_path / "visa.csv", "BECU VISA Card", [
+        ("2021-12-30", "GROCERY", "10.25"),
+        ("2021-12-31", "PAYMENT - THANK YOU", "-100.00"),
+        ("2022-01-02", "GROCERY", "5.75"),
+        ("2022-01-03", "Refund", "-1.00"),
+    ])
+    venmo = write_statement(tmp_path / "venmo.csv", "Venmo Credit Card", [
+        ("2022-01-15", "COFFEE", "3.10"),
+        ("2021-12-01", "Venmo payment received", "-20.00"),
+        ("2022-01-20", "FREEBIE", "0.00"),
+    ])
+    return LoadStatements([visa, venmo])
+
+
+def months_since_1970(year, month):
+    return (year - 1970) * 12 + month - 1
+
+
+@pytest.mark.parametrize("amount, cents", [
+    ("-1,234.5", -123450),
+    ("-.5", -50),
+    ("-0.00", 0),
+    ("12.34", 1234),
+    ("$7", 700),
+])
+def test_parse_cents(amount, cents):
+    assert parse_cents(amount) == cents
+
+
+def test_load_statements(two_accounts):
+    stmts = two_accounts
+    assert len(stmts) == 7
+    assert stmts.account_names == ["BECU VISA Card", "Venmo Credit Card"]
+    assert stmts.account.tolist() == [0, 0, 0, 0, 1, 1, 1]
+    assert stmts.day[0] == date(2021, 12, 30).toordinal()
+    assert stmts.cents.dtype == np.int64
+    assert stmts.cents.tolist() == [1025, -10000, 575, -100, 310, -2000, 0]
+    assert stmts.descriptions[stmts.desc[2]] == "GROCERY"
+    # Only the converters' exact payment text is a payment; a $0.00 row is still a purchase
+    assert stmts.xact_class.tolist() == [PURCHASE, PAYMENT, PURCHASE, OTHER_CREDIT,
+                                         PURCHASE, OTHER_CREDIT, PURCHASE]
+
+
+def test_period_totals_monthly(two_accounts):
+    assert period_totals(two_accounts) == [
+        ("BECU VISA Card", months_since_1970(2021, 12), PAYMENT, -10000),
+        ("BECU VISA Card", months_since_1970(2021, 12), PURCHASE, 1025),
+        ("BECU VISA Card", months_since_1970(2022, 1), OTHER_CREDIT, -100),
+        ("BECU VISA Card", months_since_1970(2022, 1), PURCHASE, 575),
+        ("Venmo Credit Card", months_since_1970(2021, 12), OTHER_CREDIT, -2000),
+        ("Venmo Credit Card", months_since_1970(2022, 1), PURCHASE, 310),
+    ]
+
+
+def test_period_totals_yearly(two_accounts):
+    assert period_totals(two_accounts, yearly=True) == [
+        ("BECU VISA Card", 2021, PAYMENT, -10000),
+        ("BECU VISA Card", 2021, PURCHASE, 1025),
+        ("BECU VISA Card", 2022, OTHER_CREDIT, -100),
+        ("BECU VISA Card", 2022, PURCHASE, 575),
+        ("Venmo Credit Card", 2021, OTHER_CREDIT, -2000),
+        ("Venmo Credit Card", 2022, PURCHASE, 310),
+    ]
+
+
+def test_period_totals_empty():
+    assert period_totals(StatementArrays()) == []
+
+
+def test_top_payees_exact_int64_sums():
+    # Large enough that a float64 sum of these cents would drop the trailing cent
+    big = 2 ** 53
+    stmts = StatementArrays(descriptions=["A", "B", "C"],
+                            account=np.zeros(4, dtype=np.int32),
+                            day=np.full(4, date(2022, 1, 1).toordinal(), dtype=np.int64),
+                            cents=np.array([big, 1, 5, -7], dtype=np.int64),
+                            desc=np.array([0, 0, 1, 2], dtype=np.int32),
+                            xact_class=np.array([PURCHASE, PURCHASE, PURCHASE, OTHER_CREDIT], dtype=np.int8))
+    assert top_payees(stmts) == [("A", 2, big + 1), ("B", 1, 5)]
+    assert top_payees(stmts, 1) == [("A", 2, big + 1)]
+
+
+@pytest.mark.parametrize("count", [0, -1])
+def test_top_payees_rejects_non_positive_count(two_accounts, count):
+    with pytest.raises(ValueError):
+        top_payees(two_accounts, count)
+
+
+def test_running_balances_rebased_per_account(two_accounts):
+    stmts = two_accounts
+    order, balances = running_balances(stmts)
+    # The Venmo rows were loaded out of date order; within each account they come back sorted by date
+    assert order.tolist() == [0, 1, 2, 3, 5, 4, 6]
+    assert balances.tolist() == [1025, -8975, -8400, -8500, -2000, -1690, -1690]